@@ -19,6 +19,8 @@ if TYPE_CHECKING:
 class Wget(Tool):
     # Saving '/home/username/lisa_working/20240323/20240323-070329-867/kvp_client'
     __pattern_path = re.compile(r"([\w\W]*?)Saving.*(‘|')(?P<path>.+?)(’|')")
+    # The file is already fully retrieved; nothing to do.
+    __fully_retrieved_pattern = re.compile(r"already fully retrieved")
 
     @property
     def command(self) -> str:
@@ -48,6 +50,7 @@ class Wget(Tool):
         sudo: bool = False,
         force_run: bool = False,
         timeout: int = 600,
+        resume: bool = False,
     ) -> str:
         cached_filename = self._url_file_cache.get(url, None)
         if cached_filename:
@@ -69,6 +72,10 @@ class Wget(Tool):
         if overwrite and self.node.shell.exists(download_pure_path):
             self.node.shell.remove(download_pure_path, recursive=True)
         command = f"'{url}' --no-check-certificate"
+        if resume:
+            # continue a partial download, which is left by a failed or timed
+            # out attempt, instead of starting over.
+            command = f"{command} -c"
         if filename:
             command = f"{command} -O {download_path}"
         else:
@@ -91,6 +98,8 @@ class Wget(Tool):
             matched_result = self.__pattern_path.match(temp_log)
             if matched_result:
                 download_file_path = matched_result.group("path")
+            elif resume and self.__fully_retrieved_pattern.search(temp_log):
+                download_file_path = download_path
             else:
                 self.node.tools[Rm].remove_file(log_file, sudo=sudo)
                 raise LisaException(
@@ -171,6 +180,7 @@ class WindowsWget(Wget):
         sudo: bool = False,
         force_run: bool = False,
         timeout: int = 600,
+        resume: bool = False,
     ) -> str:
         cached_filename = self._url_file_cache.get(url, None)
         if cached_filename:
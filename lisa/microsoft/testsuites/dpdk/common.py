@@ -3,19 +3,26 @@
 
 from enum import Enum
 from pathlib import PurePath
-from typing import Any, Callable, Dict, List, Optional, Sequence, Type, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
 from urllib.parse import urlparse
 
 from assertpy import assert_that
 from semver import VersionInfo
-from urllib3.util.url import parse_url
 
 from lisa import Node
 from lisa.executable import Tool
-from lisa.operating_system import Debian, Fedora, Oracle, Posix, Suse, Ubuntu
+from lisa.operating_system import (
+    Debian,
+    Fedora,
+    OperatingSystem,
+    Oracle,
+    Posix,
+    Suse,
+    Ubuntu,
+)
 from lisa.tools import Git, Lscpu, Tar, Wget
 from lisa.tools.lscpu import CpuArchitecture
-from lisa.util import UnsupportedDistroException
+from lisa.util import LisaException, UnsupportedDistroException, parse_version
 
 DPDK_STABLE_GIT_REPO = "https://dpdk.org/git/dpdk-stable"
 
@@ -47,6 +54,22 @@ class OsPackageDependencies:
         self.stop_on_match = stop_on_match
         self.requires_reboot = requires_reboot
 
+    # shortcut for the common case, which matches on the distro family only.
+    @classmethod
+    def for_types(
+        cls,
+        os_types: Tuple[Type[Posix], ...],
+        packages: Optional[Sequence[Union[str, Tool, Type[Tool]]]] = None,
+        stop_on_match: bool = False,
+        requires_reboot: bool = False,
+    ) -> "OsPackageDependencies":
+        return cls(
+            matcher=lambda x: isinstance(x, os_types),
+            packages=packages,
+            stop_on_match=stop_on_match,
+            requires_reboot=requires_reboot,
+        )
+
 
 class DependencyInstaller:
     # provide a list of OsPackageDependencies for a project
@@ -62,7 +85,8 @@ class DependencyInstaller:
             "DependencyInstaller is not compatible with this OS: "
             f"{os.information.vendor} {os.information.release}"
         )
-        # find the match for an OS, install the packages.
+        # find the match for an OS, collect the packages and install them
+        # in a single package manager transaction.
         # stop on list end or if exclusive_match parameter is true.
         packages: List[Union[str, Tool, Type[Tool]]] = []
         for requirement in self.requirements:
@@ -74,7 +98,9 @@ class DependencyInstaller:
                     node.reboot()
                 if requirement.stop_on_match:
                     break
-        os.install_packages(packages=packages, extra_args=extra_args)
+        # skip the package manager entirely if nothing is left to install.
+        if packages:
+            os.install_packages(packages=packages, extra_args=extra_args)
 
         # NOTE: It is up to the caller to raise an exception on an invalid OS
 
@@ -107,15 +133,55 @@ class GitDownloader(Downloader):
         # The expectation is that the parent Installer class should
         # remove any lingering installations
         work_path = self._node.get_working_path_with_required_space(5)
-        self.asset_path = self._node.tools[Git].clone(
+        cwd = self._node.get_pure_path(work_path)
+        git = self._node.tools[Git]
+        if self._git_ref:
+            # only the tree at the ref is needed, so try a shallow clone first.
+            try:
+                self.asset_path = git.clone(
+                    self._git_repo,
+                    cwd=cwd,
+                    ref=self._git_ref,
+                    fail_on_exists=False,
+                    depth=1,
+                )
+                return self.asset_path
+            except LisaException as identifier:
+                # commit ids can't be cloned shallowly, fall back to a full clone.
+                self._node.log.debug(
+                    f"shallow clone of '{self._git_ref}' failed, "
+                    f"fall back to full clone. {identifier}"
+                )
+        # partial clone skips downloading file contents of the whole history,
+        # the history itself is kept for tags lookup and checkout of any ref.
+        filter_ = ""
+        if git.get_version() >= "2.19.0":
+            filter_ = "blob:none"
+        self.asset_path = git.clone(
             self._git_repo,
-            cwd=self._node.get_pure_path(work_path),
+            cwd=cwd,
             ref=self._git_ref,
             fail_on_exists=False,
+            filter_=filter_,
         )
         return self.asset_path
 
 
+# supported tarball suffixes and their (gzip, bzip2) flags for extraction.
+# tar detects other compressions like xz by itself, when no flag is set.
+_TARBALL_COMPRESSION: Dict[str, Tuple[bool, bool]] = {
+    ".tar.gz": (True, False),
+    ".tgz": (True, False),
+    ".tar.bz2": (False, True),
+    ".tar.xz": (False, False),
+    ".tar": (False, False),
+}
+
+
+# written into the extracted folder after a complete extraction
+_TARBALL_EXTRACTED_MARKER = ".lisa_extracted"
+
+
 # parent class for tarball source installations
 class TarDownloader(Downloader):
     def __init__(
@@ -134,46 +200,100 @@ class TarDownloader(Downloader):
         work_path = self._node.get_pure_path(
             self._node.get_working_path_with_required_space(5)
         )
-        is_tarball = False
-        for suffix in [".tar.gz", ".tar.bz2", ".tar"]:
-            if self._tar_url.endswith(suffix):
-                is_tarball = True
-                break
-        assert_that(is_tarball).described_as(
+        suffix = next(
+            (x for x in _TARBALL_COMPRESSION if self._tar_url.endswith(x)), ""
+        )
+        assert_that(suffix).described_as(
             (
-                "Source path is not a .tar[.gz|.bz2] file. "
+                "Source path is not a .tar[.gz|.bz2|.xz] or .tgz file. "
                 f"Tar url was set to: {self._tar_url} "
             )
-        ).is_true()
+        ).is_not_empty()
+        tar = node.tools[Tar]
         if self._is_remote_tarball:
-            tarfile = node.tools[Wget].get(
-                self._tar_url,
-                overwrite=False,
-                file_path=str(work_path),
-            )
-            remote_path = node.get_pure_path(tarfile)
-            self.tar_filename = remote_path.name
+            self.tar_filename = urlparse(self._tar_url).path.split("/")[-1]
+            remote_path = work_path.joinpath(self.tar_filename)
+            # release tarballs don't change, so reuse the one downloaded by
+            # an earlier run. An incomplete one is resumed on failed extraction.
+            reused_tarball = node.shell.exists(remote_path)
+            if reused_tarball:
+                node.log.debug(f"reuse downloaded tarball {remote_path}")
+            else:
+                tarfile = node.tools[Wget].get(
+                    self._tar_url,
+                    overwrite=False,
+                    file_path=str(work_path),
+                    resume=True,
+                )
+                remote_path = node.get_pure_path(tarfile)
+                self.tar_filename = remote_path.name
         else:
+            reused_tarball = False
             self.tar_filename = PurePath(self._tar_url).name
             remote_path = work_path.joinpath(self.tar_filename)
             node.shell.copy(
                 local_path=PurePath(self._tar_url),
                 node_path=remote_path,
             )
-        tar_root_folder = node.tools[Tar].get_root_folder(str(remote_path))
+        # listing the whole archive is another full read and decompression of
+        # it, so only the first entry is read to find the root folder.
+        tar_root_folder = tar.get_root_folder(str(remote_path), first_entry_only=True)
         # create tarfile dest dir
         self.asset_path = work_path.joinpath(tar_root_folder)
+        # the marker is written only after a complete extraction, so sources
+        # left by an interrupted run are extracted again to fill in the gaps.
+        extracted_marker = self.asset_path.joinpath(_TARBALL_EXTRACTED_MARKER)
+        if node.shell.exists(extracted_marker):
+            # already extracted by an earlier run, skip unpacking it again.
+            node.log.debug(f"reuse extracted sources in {self.asset_path}")
+            return self.asset_path
+        gzip, bzip2 = _TARBALL_COMPRESSION[suffix]
+        try:
+            try:
+                self._extract(remote_path, work_path, gzip, bzip2)
+            except AssertionError:
+                if not reused_tarball:
+                    raise
+                # the reused tarball may be a partial download of an
+                # interrupted run. wget -c completes it, then extract once more.
+                node.log.debug(f"resume {remote_path} and extract it again")
+                node.tools[Wget].get(
+                    self._tar_url,
+                    overwrite=False,
+                    file_path=str(work_path),
+                    force_run=True,
+                    resume=True,
+                )
+                self._extract(remote_path, work_path, gzip, bzip2)
+        except (AssertionError, LisaException):
+            # don't leave partial sources or a broken tarball to be reused.
+            node.shell.remove(self.asset_path, recursive=True)
+            if self._is_remote_tarball:
+                node.shell.remove(remote_path)
+            raise
+        node.execute(
+            f"touch {extracted_marker}",
+            shell=True,
+            expected_exit_code=0,
+            expected_exit_code_failure_message=f"failed to create {extracted_marker}",
+        )
+        return self.asset_path
+
+    def _extract(
+        self, tar_path: PurePath, work_path: PurePath, gzip: bool, bzip2: bool
+    ) -> None:
         # unpack into the dest dir
         # force name as tarfile name
         # add option to skip files which already exist on disk
         # in the event we have already extracted this specific tar
-        node.tools[Tar].extract(
-            file=str(remote_path),
+        self._node.tools[Tar].extract(
+            file=str(tar_path),
             dest_dir=str(work_path),
-            gzip=True,
+            gzip=gzip,
+            bzip2=bzip2,
             skip_existing_files=True,
+            record_size="1M",
         )
-        return self.asset_path
 
 
 class Installer:
@@ -221,18 +341,22 @@ class Installer:
         raise NotImplementedError(f"get_installed_version {self._err_msg}")
 
     def _should_install(self, required_version: Optional[VersionInfo] = None) -> bool:
-        return (not self._check_if_installed()) or (
-            required_version is not None
-            and required_version > self.get_installed_version()
-        )
+        if not self._check_if_installed():
+            return True
+        # installed, only query the version if a specific one is required.
+        if required_version is None:
+            return False
+        return bool(required_version > self.get_installed_version())
 
     # run the defined setup and installation steps.
     def do_installation(self, required_version: Optional[VersionInfo] = None) -> None:
         self._setup_node()
-        if self._should_install():
+        if self._should_install(required_version):
             self._uninstall()
             self._install_dependencies()
             self._install()
+            # package states changed, drop the results of earlier checks.
+            self._installed_cache.clear()
 
     def __init__(
         self,
@@ -249,6 +373,9 @@ class Installer:
         self._package_manager_extra_args: List[str] = []
         self._os_dependencies = os_dependencies
         self._downloader = downloader
+        # package existence checks are remote queries, cache the results
+        # until packages are installed or uninstalled.
+        self._installed_cache: Dict[Union[str, Tool, Type[Tool]], bool] = {}
 
 
 # Base class for package manager installation
@@ -266,6 +393,7 @@ class PackageManagerInstall(Installer):
                     self._os.uninstall_packages(os_package_check.packages)
                     if os_package_check.stop_on_match:
                         break
+        self._installed_cache.clear()
 
     # verify packages on the node have been installed by
     # the package manager
@@ -273,15 +401,20 @@ class PackageManagerInstall(Installer):
         # WARNING: Don't use this for long lists of packages.
         # For dpdk, pkg-manager install is only for 'dpdk' and 'dpdk-dev'
         # This will take too long if it's more than a few packages.
-        if self._os_dependencies is not None:
-            for os_package_check in self._os_dependencies.requirements:
-                if os_package_check.matcher(self._os) and os_package_check.packages:
-                    for pkg in os_package_check.packages:
-                        if not self._os.package_exists(pkg):
-                            return False
-                    if os_package_check.stop_on_match:
-                        break
-        return True
+        if self._os_dependencies is None:
+            return True
+        packages: List[Union[str, Tool, Type[Tool]]] = []
+        for os_package_check in self._os_dependencies.requirements:
+            if os_package_check.matcher(self._os) and os_package_check.packages:
+                packages += os_package_check.packages
+                if os_package_check.stop_on_match:
+                    break
+        # query the packages, which are not checked yet, in one call.
+        unchecked = [x for x in packages if x not in self._installed_cache]
+        if unchecked:
+            exists = self._os.packages_exist(unchecked)
+            self._installed_cache.update(zip(unchecked, exists))
+        return all(self._installed_cache[x] for x in packages)
 
 
 def force_dpdk_default_source(variables: Dict[str, Any]) -> None:
@@ -290,24 +423,24 @@ def force_dpdk_default_source(variables: Dict[str, Any]) -> None:
 
 
 _UBUNTU_LTS_VERSIONS = ["24.4.0", "22.4.0", "20.4.0", "18.4.0"]
+# parsed once, the checks below run for every Ubuntu node.
+_UBUNTU_LATEST_LTS_VERSION = max(_UBUNTU_LTS_VERSIONS, key=parse_version)
+_UBUNTU_LTS_MAJOR_MINORS = frozenset(
+    (int(major), int(minor))
+    for major, minor, _ in (x.split(".") for x in _UBUNTU_LTS_VERSIONS)
+)
 
 
 # see https://ubuntu.com/about/release-cycle
 def is_ubuntu_latest_or_prerelease(distro: Ubuntu) -> bool:
-    return bool(distro.information.version >= max(_UBUNTU_LTS_VERSIONS))
+    return bool(distro.information.version >= _UBUNTU_LATEST_LTS_VERSION)
 
 
 # see https://ubuntu.com/about/release-cycle
 def is_ubuntu_lts_version(distro: Ubuntu) -> bool:
-    major = str(distro.information.version.major)
-    minor = str(distro.information.version.minor)
+    version = distro.information.version
     # check for major+minor version match
-    return any(
-        [
-            major == x.split(".", maxsplit=1)[0] and minor == x.split(".")[1]
-            for x in _UBUNTU_LTS_VERSIONS
-        ]
-    )
+    return (version.major, version.minor) in _UBUNTU_LTS_MAJOR_MINORS
 
 
 # check if it's a lts release outside the initial 2 year lts window
@@ -315,44 +448,61 @@ def ubuntu_needs_backports(os: Ubuntu) -> bool:
     return not is_ubuntu_latest_or_prerelease(os) and is_ubuntu_lts_version(os)
 
 
+def _is_ubuntu_dpdk_supported(node: Node) -> bool:
+    assert isinstance(node.os, Ubuntu)
+    is_latest_or_prerelease = is_ubuntu_latest_or_prerelease(node.os)
+    is_lts_version = is_ubuntu_lts_version(node.os)
+    node.log.debug(
+        "Checking Ubuntu release: "
+        f"is_latest_or_prerelease? ({is_latest_or_prerelease})"
+        f" is_lts_version? ({is_lts_version})"
+    )
+    # TODO: undo special casing for 18.04 when it's usage is less common
+    return bool(
+        node.os.information.version == "18.4.0"
+        or is_latest_or_prerelease
+        or is_lts_version
+    )
+
+
+# checks for the minimal supported release of each distro family. The most
+# derived class in the distro's mro wins, so Ubuntu is checked before Debian.
+# None means the distro is not supported at all.
+_DPDK_SUPPORT_CHECKERS: Dict[Type[Posix], Optional[Callable[[Node], bool]]] = {
+    Ubuntu: _is_ubuntu_dpdk_supported,
+    Debian: lambda node: bool(node.os.information.version >= "11.0.0"),
+    Oracle: None,
+    Fedora: lambda node: bool(node.os.information.version >= "7.5.0"),
+    Suse: lambda node: bool(node.os.information.version >= "15.0.0"),
+}
+
+
+def _get_dpdk_support_checker(os: OperatingSystem) -> Optional[Callable[[Node], bool]]:
+    for os_type in type(os).__mro__:
+        if os_type in _DPDK_SUPPORT_CHECKERS:
+            return _DPDK_SUPPORT_CHECKERS[os_type]
+    return None
+
+
 def check_dpdk_support(node: Node) -> None:
     # check requirements according to:
     # https://docs.microsoft.com/en-us/azure/virtual-network/setup-dpdk
-    supported = False
     arch = node.tools[Lscpu].get_architecture()
     if arch == CpuArchitecture.ARM64 and not isinstance(node.os, Ubuntu):
         raise UnsupportedDistroException(
             node.os, "ARM64 tests are only supported on Ubuntu + failsafe."
         )
-    if isinstance(node.os, Debian):
-        if isinstance(node.os, Ubuntu):
-            node.log.debug(
-                "Checking Ubuntu release: "
-                f"is_latest_or_prerelease? ({is_ubuntu_latest_or_prerelease(node.os)})"
-                f" is_lts_version? ({is_ubuntu_lts_version(node.os)})"
-            )
-            # TODO: undo special casing for 18.04 when it's usage is less common
-            supported = (
-                node.os.information.version == "18.4.0"
-                or is_ubuntu_latest_or_prerelease(node.os)
-                or is_ubuntu_lts_version(node.os)
-            )
-        else:
-            supported = node.os.information.version >= "11.0.0"
-    elif isinstance(node.os, Fedora) and not isinstance(node.os, Oracle):
-        supported = node.os.information.version >= "7.5.0"
-    elif isinstance(node.os, Suse):
-        supported = node.os.information.version >= "15.0.0"
-    else:
+    checker = _get_dpdk_support_checker(node.os)
+    if checker is None:
         # this OS is not supported
         raise UnsupportedDistroException(
             node.os, "This OS is not supported by the DPDK test suite for Azure."
         )
-    # verify MANA driver is available for the kernel version
-    if (
-        isinstance(node.os, (Debian, Fedora, Suse, Fedora))
-        and node.nics.is_mana_device_present()
-    ):
+    supported = checker(node)
+    # verify MANA driver is available for the kernel version.
+    # the OS is one of Debian, Fedora or Suse at this point.
+    if node.nics.is_mana_device_present():
+        assert isinstance(node.os, Posix)
         # NOTE: Kernel backport examples are available for lower kernels.
         # HOWEVER: these are not suitable for general testing and should be installed
         # in the image _before_ starting the test.
@@ -368,30 +518,26 @@ def check_dpdk_support(node: Node) -> None:
         )
 
 
+_GIT_PATH_PARTS = frozenset(["git", "_git"])
+
+
 def is_url_for_tarball(url: str) -> bool:
     # fetch the resource from the url
     # ex. get example/thing.tar from www.github.com/example/thing.tar.gz
     url_path = urlparse(url).path
-    if not url_path:
-        return False
-    suffixes = PurePath(url_path).suffixes
-    if not suffixes:
-        return False
-    # check if '.tar' in [ '.tar', '.gz' ]
-    return ".tar" in suffixes
+    return url_path.endswith(tuple(_TARBALL_COMPRESSION))
 
 
 def is_url_for_git_repo(url: str) -> bool:
-    parsed_url = parse_url(url)
-    scheme = parsed_url.scheme
-    path = parsed_url.path
-    if not (scheme and path):
+    # only the scheme and path are needed, split them without a full parse.
+    scheme, separator, rest = url.partition("://")
+    scheme = scheme.lower()
+    path = rest.partition("/")[2].partition("?")[0].partition("#")[0]
+    if not (separator and scheme and path):
         return False
     # investigate the rest of the URL as a path
-    path_check = PurePath(path)
     check_for_git_https = scheme in ["http", "https"] and (
-        path_check.suffixes == [".git"]
-        or any([x in path_check.parts for x in ["git", "_git"]])
+        path.endswith(".git") or not _GIT_PATH_PARTS.isdisjoint(path.split("/"))
     )
     return scheme == "git" or check_for_git_https
 
@@ -66,8 +66,8 @@ DPDK_PACKAGE_MANAGER_PACKAGES = DependencyInstaller(
             packages=["linux-modules-extra-azure"],
             requires_reboot=True,
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, Debian),
+        OsPackageDependencies.for_types(
+            (Debian,),
             packages=["dpdk", "dpdk-dev"],
             stop_on_match=True,
         ),
@@ -85,8 +85,8 @@ DPDK_PACKAGE_MANAGER_PACKAGES = DependencyInstaller(
             packages=["dpdk"],
             stop_on_match=True,
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, (Fedora, Suse)),
+        OsPackageDependencies.for_types(
+            (Fedora, Suse),
             packages=["dpdk", "dpdk-devel"],
             stop_on_match=True,
         ),
@@ -122,8 +122,8 @@ DPDK_SOURCE_INSTALL_PACKAGES = DependencyInstaller(
             packages=["linux-modules-extra-azure"],
             requires_reboot=True,
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, Debian),
+        OsPackageDependencies.for_types(
+            (Debian,),
             packages=[
                 "build-essential",
                 "libnuma-dev",
@@ -133,8 +133,8 @@ DPDK_SOURCE_INSTALL_PACKAGES = DependencyInstaller(
             ],
             stop_on_match=True,
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, Suse),
+        OsPackageDependencies.for_types(
+            (Suse,),
             packages=[
                 "psmisc",
                 "libnuma-devel",
@@ -144,8 +144,8 @@ DPDK_SOURCE_INSTALL_PACKAGES = DependencyInstaller(
             ],
             stop_on_match=True,
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, (Fedora)),
+        OsPackageDependencies.for_types(
+            (Fedora,),
             packages=[
                 "psmisc",
                 "numactl-devel",
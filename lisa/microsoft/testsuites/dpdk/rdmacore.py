@@ -27,8 +27,8 @@ RDMA_CORE_SOURCE_DEPENDENCIES = DependencyInstaller(
             and x.is_package_in_repo("linux-modules-extra-azure"),
             packages=["linux-modules-extra-azure"],
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, Debian),
+        OsPackageDependencies.for_types(
+            (Debian,),
             packages=[
                 "cmake",
                 "libudev-dev",
@@ -48,8 +48,8 @@ RDMA_CORE_SOURCE_DEPENDENCIES = DependencyInstaller(
             ],
             stop_on_match=True,
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, Fedora),
+        OsPackageDependencies.for_types(
+            (Fedora,),
             packages=[
                 "cmake",
                 "libudev-devel",
@@ -93,20 +93,20 @@ RDMA_CORE_PACKAGE_MANAGER_DEPENDENCIES = DependencyInstaller(
             and x.is_package_in_repo("linux-modules-extra-azure"),
             packages=["linux-modules-extra-azure"],
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, Debian),
+        OsPackageDependencies.for_types(
+            (Debian,),
             packages=["ibverbs-providers", "libibverbs-dev"],
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, Suse),
+        OsPackageDependencies.for_types(
+            (Suse,),
             packages=["rdma-core-devel", "librdmacm1"],
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, Fedora),
+        OsPackageDependencies.for_types(
+            (Fedora,),
             packages=["librdmacm-devel"],
         ),
-        OsPackageDependencies(
-            matcher=lambda x: isinstance(x, (Fedora, Debian, Suse)),
+        OsPackageDependencies.for_types(
+            (Fedora, Debian, Suse),
             packages=["rdma-core"],
             stop_on_match=True,
         ),
@@ -210,8 +210,8 @@ class Lis(TestSuite):
     def _check_lis_version(
         self, node: Node, version: str, source_version: str, log: Logger
     ) -> None:
-        log.debug("Detected modinfo version is {version}")
-        log.debug("Version found in source code is {source_version}")
+        log.debug(f"Detected modinfo version is {version}")
+        log.debug(f"Version found in source code is {source_version}")
 
         assert_that(version).described_as(
             "Detected version and Source version are different. Expected LIS version:"
@@ -222,8 +222,8 @@ class Lis(TestSuite):
     def _check_lis_version_hex(
         self, node: Node, version: str, source_version_hex: str, log: Logger
     ) -> None:
-        log.debug("Detected modinfo version is {version}")
-        log.debug("Version found in source code is {source_version}")
+        log.debug(f"Detected modinfo version is {version}")
+        log.debug(f"Version found in source code is {source_version_hex}")
 
         # The below two lines are converting the inputted LIS version to hex
         version_hex = version.replace(".", "")
@@ -65,14 +65,28 @@ Known Limitations:
 
 import string
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    cast,
+)
 
 from microsoft.testsuites.xfstests.xfstests import (
     DEFAULT_WORKER_BASE_DIR,
     Xfstests,
     XfstestsParallelRunner,
 )
+from semver import VersionInfo
 
 from lisa import (
     Logger,
@@ -89,12 +103,20 @@ from lisa import (
 )
 from lisa.environment import Environment
 from lisa.features import Disk, Nvme
-from lisa.operating_system import BSD, CBLMariner, Oracle, Redhat, Windows
+from lisa.operating_system import (
+    BSD,
+    CBLMariner,
+    OperatingSystem,
+    Oracle,
+    Redhat,
+    Windows,
+)
 from lisa.sut_orchestrator import AZURE, HYPERV
 from lisa.sut_orchestrator.azure.features import AzureFileShare, FileShareProtocol
 from lisa.sut_orchestrator.azure.platform_ import AzurePlatform
 from lisa.testsuite import TestResult
 from lisa.tools import (
+    Cat,
     Echo,
     FileSystem,
     KernelConfig,
@@ -105,6 +127,7 @@ from lisa.tools import (
     Ssh,
 )
 from lisa.util import BadEnvironmentStateException, constants, generate_random_chars
+from lisa.util.parallel import run_in_parallel
 
 # =============================================================================
 # Global Configuration Variables
@@ -308,6 +331,22 @@ _default_smb_testcases: str = (
 _scratch_folder = "/mnt/scratch"
 _test_folder = "/mnt/test"
 
+# Azure file share names only allow lowercase letters and digits.
+_share_name_chars = string.ascii_lowercase + string.digits
+
+# Extra excluded tests for distro versions, as (os type, version check, tests).
+# Checked once per run in _execute_xfstests, against the node's OS version.
+_distro_excluded_tests: List[
+    Tuple[Type[OperatingSystem], Callable[[VersionInfo], bool], FrozenSet[str]]
+] = [
+    (Oracle, lambda version: version.compare("9.0.0") <= 0, frozenset(["btrfs/299"])),
+    # TODO: will include generic/641 once the kernel contains below fix.
+    # exclude this case generic/641 temporarily
+    # it will trigger oops on RHEL8.3/8.4, VM will reboot
+    # lack of commit 5808fecc572391867fcd929662b29c12e6d08d81
+    (Redhat, lambda version: version.compare("8.3.0") >= 0, frozenset(["generic/641"])),
+]
+
 # -----------------------------------------------------------------------------
 # Parallel Worker Configuration
 # -----------------------------------------------------------------------------
@@ -397,18 +436,62 @@ def _prepare_data_disk(
     parted = node.tools[Parted]
     mkfs = node.tools[Mkfs]
 
+    # only unmount what is actually mounted. The partitions and mount points
+    # don't need to be erased here, because mklabel below recreates the
+    # partition table, and the mount points are recreated after formatting.
+    mount_points = _get_mount_points(node)
     for disk, mount_point in disk_mount.items():
-        mount.umount(disk, mount_point)
+        if mount_point in mount_points:
+            mount.umount(disk, mount_point, erase=False)
+
+    parted.make_label_and_partitions(
+        disk_name, [("primary", "1", "50%"), ("secondary", "50%", "100%")]
+    )
+    # make sure the kernel has picked up the new partitions before formatting.
+    # It only rereads this disk, unlike a global sync. partprobe comes with
+    # parted.
+    node.execute(f"partprobe {disk_name}", sudo=True)
+
+    # the partitions are independent block devices, so format them in parallel.
+    # The mkfs tool is resolved first, so the workers don't both install it.
+    mkfs.get_mkfs_tool(file_system)
+    run_in_parallel(
+        [partial(mkfs.format_disk, disk, file_system) for disk in disk_mount]
+    )
+    node.execute(f"mkdir -p {' '.join(disk_mount.values())}", sudo=True)
+
+
+def _get_distro_excluded_tests(node: Node) -> Set[str]:
+    excluded_tests: Set[str] = set()
+    for os_type, is_version_matched, tests in _distro_excluded_tests:
+        if isinstance(node.os, os_type) and is_version_matched(
+            node.os.information.version
+        ):
+            excluded_tests.update(tests)
+    return excluded_tests
+
+
+def _remove_device_mappers(node: Node, names: List[str]) -> None:
+    # check and remove all devices in one remote command.
+    paths = " ".join(f"/dev/mapper/{name}" for name in names)
+    node.execute(
+        f"for path in {paths}; do "
+        '[ -e "$path" ] && dmsetup remove "$path"; done; true',
+        sudo=True,
+        shell=True,
+    )
 
-    parted.make_label(disk_name)
-    parted.make_partition(disk_name, "primary", "1", "50%")
-    node.execute("sync")
-    parted.make_partition(disk_name, "secondary", "50%", "100%")
-    node.execute("sync")
 
-    for disk, mount_point in disk_mount.items():
-        mkfs.format_disk(disk, file_system)
-        node.execute(f"mkdir {mount_point}", sudo=True)
+def _get_mount_points(node: Node) -> Set[str]:
+    # /proc/mounts lines are "<device> <mount point> <type> <options> ...". Unlike
+    # Mount.get_partition_info, it includes network file systems like cifs and nfs.
+    mount_points: Set[str] = set()
+    content = node.tools[Cat].read("/proc/mounts", force_run=True)
+    for line in content.splitlines():
+        fields = line.split()
+        if len(fields) > 1:
+            mount_points.add(fields[1])
+    return mount_points
 
 
 # Updates as of December 2025.
@@ -537,21 +620,18 @@ class Xfstesting(TestSuite):
     # generic/738 case might cause hang more than 4 hours on old kernel
     # TODO: will figure out the detailed reason of every excluded case.
     # exclude generic/680 for security reason.
-    excluded_tests = (
-        "generic/211 generic/430 generic/431 generic/434 generic/738 xfs/438 xfs/490"
-        + " btrfs/007 btrfs/178 btrfs/244 btrfs/262"
-        + " xfs/030 xfs/032 xfs/050 xfs/052 xfs/106 xfs/107 xfs/122 xfs/132 xfs/138"
-        + " xfs/144 xfs/148 xfs/175 xfs/191-input-validation xfs/289 xfs/293 xfs/424"
-        + " xfs/432 xfs/500 xfs/508 xfs/512 xfs/514 xfs/515 xfs/516 xfs/518 xfs/521"
-        + " xfs/528 xfs/544 ext4/054 ext4/056 ext4/058 ext4/059 xfs/081 xfs/520"
-        + " generic/680"
+    excluded_tests: FrozenSet[str] = frozenset(
+        (
+            "generic/211 generic/430 generic/431 generic/434 generic/738"
+            " xfs/438 xfs/490 btrfs/007 btrfs/178 btrfs/244 btrfs/262"
+            " xfs/030 xfs/032 xfs/050 xfs/052 xfs/106 xfs/107 xfs/122 xfs/132 xfs/138"
+            " xfs/144 xfs/148 xfs/175 xfs/191-input-validation xfs/289 xfs/293 xfs/424"
+            " xfs/432 xfs/500 xfs/508 xfs/512 xfs/514 xfs/515 xfs/516 xfs/518 xfs/521"
+            " xfs/528 xfs/544 ext4/054 ext4/056 ext4/058 ext4/059 xfs/081 xfs/520"
+            " generic/680"
+        ).split()
     )
 
-    def before_case(self, log: Logger, **kwargs: Any) -> None:
-        node = kwargs["node"]
-        if isinstance(node.os, Oracle) and (node.os.information.version <= "9.0.0"):
-            self.excluded_tests = self.excluded_tests + " btrfs/299"
-
     @TestCaseMetadata(
         description="""
         This test case will run generic xfstests testing against
@@ -996,16 +1076,18 @@ class Xfstesting(TestSuite):
 
         # Step 1: Unmount worker mount points based on protocol
         log.debug(f"Cleaning up worker {ctx.protocol.upper()} mount points...")
+        nfs_client = node.tools[NFSClient] if ctx.protocol == "nfs" else None
+        mount = node.tools[Mount]
         for worker_id in runner.worker_ids():
             test_mount = f"{_test_folder}_worker_{worker_id}"
             scratch_mount = f"{_scratch_folder}_worker_{worker_id}"
             try:
-                if ctx.protocol == "nfs":
-                    node.tools[NFSClient].stop(test_mount)
-                    node.tools[NFSClient].stop(scratch_mount)
+                if nfs_client:
+                    nfs_client.stop(test_mount)
+                    nfs_client.stop(scratch_mount)
                 else:
-                    node.tools[Mount].umount("", test_mount, erase=False)
-                    node.tools[Mount].umount("", scratch_mount, erase=False)
+                    mount.umount("", test_mount, erase=False)
+                    mount.umount("", scratch_mount, erase=False)
             except Exception:
                 pass  # Ignore unmount failures (may already be unmounted)
 
@@ -1205,6 +1287,7 @@ class Xfstesting(TestSuite):
         self._create_worker_mount_points(node, runner)
 
         # Mount NFS shares and configure each worker's local.config
+        nfs_client = node.tools[NFSClient]
         worker_paths = runner.worker_paths
         for worker_id in runner.worker_ids():
             test_mount = f"{_test_folder}_worker_{worker_id}"
@@ -1228,10 +1311,10 @@ class Xfstesting(TestSuite):
             )
 
             # Mount NFS shares
-            node.tools[NFSClient].setup(
+            nfs_client.setup(
                 ctx.nfs_server, test_export, test_mount, options=ctx.mount_opts
             )
-            node.tools[NFSClient].setup(
+            nfs_client.setup(
                 ctx.nfs_server, scratch_export, scratch_mount, options=ctx.mount_opts
             )
 
@@ -1289,9 +1372,9 @@ class Xfstesting(TestSuite):
             raise UnsupportedDistroException(
                 node.os, "current distro is not enabled with cifs module."
             )
-        xfstests = self._install_xfstests(node)
         azure_file_share = node.features[AzureFileShare]
-        random_str = generate_random_chars(string.ascii_lowercase + string.digits, 10)
+        xfstests = self._install_xfstests(node)
+        random_str = generate_random_chars(_share_name_chars, 10)
 
         # Create parallel runner for worker management
         runner = XfstestsParallelRunner(
@@ -1410,12 +1493,12 @@ class Xfstesting(TestSuite):
         assert isinstance(environment.platform, AzurePlatform)
         node = cast(RemoteNode, environment.nodes[0])
 
+        # Get Azure File Share feature before the lengthy xfstests install
+        azure_file_share = node.features[AzureFileShare]
+
         # Install xfstests
         xfstests = self._install_xfstests(node)
-
-        # Get Azure File Share feature
-        azure_file_share = node.features[AzureFileShare]
-        random_str = generate_random_chars(string.ascii_lowercase + string.digits, 10)
+        random_str = generate_random_chars(_share_name_chars, 10)
 
         # Create parallel runner for worker management
         runner = XfstestsParallelRunner(
@@ -1519,7 +1602,7 @@ class Xfstesting(TestSuite):
         -----------------------------
         The worker cleanup loops (steps 3-4) reference _default_worker_count but
         are completely safe for non-parallel tests because:
-        - umount on non-existent mount points is caught and ignored
+        - umount is skipped for mount points that are not mounted
         - cleanup_worker_copy on non-existent directories is caught and ignored
         - This is "defensive cleanup" - attempts that fail are not errors
 
@@ -1528,17 +1611,16 @@ class Xfstesting(TestSuite):
         """
         try:
             node: Node = kwargs.pop("node")
-            for path in [
-                "/dev/mapper/delay-test",
-                "/dev/mapper/huge-test",
-                "/dev/mapper/huge-test-zero",
-            ]:
-                if 0 == node.execute(f"ls -lt {path}", sudo=True).exit_code:
-                    node.execute(f"dmsetup remove {path}", sudo=True)
+            # Check the device mapper targets and the mounts once, and only clean
+            # up what actually exists, instead of probing every path on the node.
+            _remove_device_mappers(node, ["delay-test", "huge-test", "huge-test-zero"])
+            mounted_points = _get_mount_points(node)
 
             # Unmount standard mount points (used by all tests)
+            mount = node.tools[Mount]
             for mount_point in [_scratch_folder, _test_folder]:
-                node.tools[Mount].umount("", mount_point, erase=False)
+                if mount_point in mounted_points:
+                    mount.umount("", mount_point, erase=False)
 
             # -------------------------------------------------------------------------
             # Parallel Execution Cleanup (verify_azure_file_share only)
@@ -1548,7 +1630,7 @@ class Xfstesting(TestSuite):
             # ONLY exist after running verify_azure_file_share.
             #
             # For all other tests (data disk, NVMe), these loops execute but:
-            # - umount fails silently (mount point doesn't exist)
+            # - umount is skipped (mount point is not mounted)
             # - cleanup_worker_copy fails silently (directory doesn't exist)
             #
             # This is intentional "best effort" cleanup that ensures resources are
@@ -1560,8 +1642,10 @@ class Xfstesting(TestSuite):
             for worker_id in range(1, _default_worker_count + 1):
                 for base_mount in [_test_folder, _scratch_folder]:
                     worker_mount = f"{base_mount}_worker_{worker_id}"
+                    if worker_mount not in mounted_points:
+                        continue
                     try:
-                        node.tools[Mount].umount("", worker_mount, erase=False)
+                        mount.umount("", worker_mount, erase=False)
                     except Exception:
                         pass  # Best effort - resource may not exist
 
@@ -1609,7 +1693,7 @@ class Xfstesting(TestSuite):
         file_system: FileSystem = FileSystem.xfs,
         test_type: str = "generic/quick",
         test_cases: str = "",
-        excluded_tests: str = "",
+        excluded_tests: Iterable[str] = (),
         mount_opts: str = "",
         testfs_mount_opts: str = "",
     ) -> None:
@@ -1636,12 +1720,7 @@ class Xfstesting(TestSuite):
             # Close the current session to apply the umask change on the next login
             node.close()
 
-        # TODO: will include generic/641 once the kernel contains below fix.
-        # exclude this case generic/641 temporarily
-        # it will trigger oops on RHEL8.3/8.4, VM will reboot
-        # lack of commit 5808fecc572391867fcd929662b29c12e6d08d81
-        if isinstance(node.os, Redhat) and node.os.information.version >= "8.3.0":
-            excluded_tests += " generic/641"
+        excluded = set(excluded_tests) | _get_distro_excluded_tests(node)
 
         # prepare data disk when xfstesting target is data disk
         if data_disk:
@@ -1663,7 +1742,7 @@ class Xfstesting(TestSuite):
             testfs_mount_opts=testfs_mount_opts,
             overwrite_config=True,
         )
-        xfstests.set_excluded_tests(excluded_tests)
+        xfstests.set_excluded_tests(excluded)
         # Reduce run_test timeout by 30s to let it complete before case Timeout.
         # Set to 30 for safety check to ensure test finishes before LISA times out.
         # We mark test_section as the name of the file system.
@@ -89,7 +89,7 @@ import time
 from dataclasses import dataclass, field
 from functools import partial
 from pathlib import Path, PurePath, PurePosixPath
-from typing import Any, Callable, Dict, List, Optional, Type, cast
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, Union, cast
 
 from assertpy import assert_that
 
@@ -1051,7 +1051,13 @@ class Xfstests(Tool):
         self._add_test_users()
         tool_path = self.get_tool_path(use_global=True)
         git = self.node.tools[Git]
-        git.clone(url=repo, cwd=tool_path, ref=branch)
+        try:
+            # Only the tree of the tag or branch is needed to build xfstests, so
+            # skip fetching the whole history.
+            git.clone(url=repo, cwd=tool_path, ref=branch, depth=1)
+        except LisaException:
+            # a custom ref may be a commit id, which cannot be cloned shallowly.
+            git.clone(url=repo, cwd=tool_path, ref=branch)
         make = self.node.tools[Make]
         code_path = tool_path.joinpath("xfstests-dev")
 
@@ -1298,7 +1304,7 @@ class Xfstests(Tool):
 
     def set_excluded_tests(
         self,
-        exclude_tests: str,
+        exclude_tests: Union[str, Iterable[str]],
         xfstests_path: Optional[PurePath] = None,
     ) -> None:
         """
@@ -1308,24 +1314,29 @@ class Xfstests(Tool):
         The method takes in the following parameters:
         exclude_tests: The test cases to be excluded from testing
         Parameters:
-        exclude_tests (str): The test cases to be excluded from testing
+        exclude_tests (str or Iterable[str]): The test cases to be excluded from
+            testing, as a space separated string or as a collection of test names.
+            A collection is written as is, without joining and splitting it again.
         xfstests_path (PurePath): (O)Custom xfstests directory path for worker
             execution. If not provided, uses the default path from get_xfstests_path().
         Example Usage:
         xfstest.set_excluded_tests(exclude_tests="generic/001 generic/002")
+        xfstest.set_excluded_tests(exclude_tests={"generic/001", "generic/002"})
         """
         if exclude_tests:
             # Use custom path if provided, otherwise use default installation path
             working_path = xfstests_path if xfstests_path else self.get_xfstests_path()
             exclude_file_path = working_path / "exclude.txt"
-            if self.node.shell.exists(exclude_file_path):
-                self.node.shell.remove(exclude_file_path)
 
             # Write all exclusions in a single command for efficiency.
             # Previous implementation used one echo per test case, causing
             # 50+ SSH roundtrips for typical exclusion lists.
-            # Now we join all tests with newlines and write once.
-            exclude_list = exclude_tests.split()
+            # Now we join all tests with newlines and write once. The write
+            # overwrites any existing exclude.txt, so it isn't removed first.
+            if isinstance(exclude_tests, str):
+                exclude_list: Iterable[str] = exclude_tests.split()
+            else:
+                exclude_list = sorted(exclude_tests)
             content = "\n".join(exclude_list)
             echo = self.node.tools[Echo]
             echo.write_to_file(content, exclude_file_path, append=False)
@@ -1500,6 +1511,7 @@ class Xfstests(Tool):
         console_log_results_path = working_path / console_log_name
         results_path = working_path / "results/check.log"
         fail_cases_list: List[str] = []
+        console_log_saved = False
         run_result = XfstestsRunResult(
             run_id=run_id or test_section,
             test_section=test_section,
@@ -1521,6 +1533,12 @@ class Xfstests(Tool):
                     timeout=120,
                 )
                 log_result.assert_exit_code()
+                # The console log content is already here, so save it directly
+                # instead of copying the same file back from the node again.
+                local_console_log = log_path / "xfstests" / console_log_name
+                local_console_log.parent.mkdir(parents=True, exist_ok=True)
+                local_console_log.write_text(log_result.stdout, encoding="utf-8")
+                console_log_saved = True
                 ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
                 raw_message = ansi_escape.sub("", log_result.stdout)
                 if send_notifications:
@@ -1592,6 +1610,7 @@ class Xfstests(Tool):
                 console_log_name,
                 check_log_name,
                 xfstests_path=working_path,
+                copy_console_log=not console_log_saved,
             )
             results_folder = working_path / "results/"
             self.node.execute(f"rm -rf {results_folder}", sudo=True)
@@ -1606,6 +1625,7 @@ class Xfstests(Tool):
         console_log_name: str = "xfstest.log",
         check_log_name: str = "check.log",
         xfstests_path: Optional[PurePath] = None,
+        copy_console_log: bool = True,
     ) -> None:
         """
         About:This method is intended to be called by check_test_results method only.
@@ -1624,6 +1644,8 @@ class Xfstests(Tool):
             check log files.
         xfstests_path: Optional custom xfstests directory path for worker execution.
             If not provided, uses the default path from get_xfstests_path().
+        copy_console_log: If False, the console log is not copied back, because
+            the caller has already saved it.
         """
         # Use custom path if provided, otherwise use default installation path
         working_path = xfstests_path if xfstests_path else self.get_xfstests_path()
@@ -1636,7 +1658,7 @@ class Xfstests(Tool):
                 log_path / f"xfstests/{check_log_name}",
             )
         console_log_path = working_path / console_log_name
-        if self._file_exists_with_timeout(console_log_path):
+        if copy_console_log and self._file_exists_with_timeout(console_log_path):
             self.node.shell.copy_back(
                 console_log_path,
                 log_path / f"xfstests/{console_log_name}",
@@ -436,6 +436,20 @@ class Posix(OperatingSystem, BaseClassMixin):
         self._log.debug(f"package '{package}' exists: {exists}")
         return exists
 
+    def packages_exist(
+        self, packages: Sequence[Union[str, Tool, Type[Tool]]]
+    ) -> List[bool]:
+        """
+        Query if packages/tools are installed on the node. Distros which can
+        query all packages at once do it in one command.
+        Return Value - List[bool], in the same order of packages
+        """
+        package_names = [self.__resolve_package_name(x) for x in packages]
+        exists = self._packages_exist(package_names)
+
+        self._log.debug(f"packages {package_names} exist: {exists}")
+        return exists
+
     def is_package_in_repo(self, package: Union[str, Tool, Type[Tool]]) -> bool:
         """
         Query if a package/tool exists in the repo
@@ -566,6 +580,10 @@ class Posix(OperatingSystem, BaseClassMixin):
     def _package_exists(self, package: str) -> bool:
         raise NotImplementedError()
 
+    def _packages_exist(self, packages: List[str]) -> List[bool]:
+        # sub os can override it to query all packages at once
+        return [self._package_exists(x) for x in packages]
+
     def _is_package_in_repo(self, package: str) -> bool:
         raise NotImplementedError()
 
@@ -1217,8 +1235,13 @@ class Debian(Linux):
         )
 
     def _package_exists(self, package: str) -> bool:
+        return self._packages_exist([package])[0]
+
+    def _packages_exist(self, packages: List[str]) -> List[bool]:
+        # all packages are checked in the output of one command.
         command = "dpkg --get-selections"
         result = self._node.execute(command, sudo=True, shell=True)
+        selections = result.stdout.splitlines()
         # Not installed package not shown in the output
         # Uninstall package will show as deinstall
         # The 'hold' status means that when the operating system is upgraded, the
@@ -1227,10 +1250,13 @@ class Debian(Linux):
         # vim                                             deinstall
         # vim-common                                      install
         # auoms                                           hold
-        package_pattern = re.compile(f"{package}([ \t]+)(install|hold)")  # noqa: E201
-        if len(list(filter(package_pattern.match, result.stdout.splitlines()))) == 1:
-            return True
-        return False
+        exists: List[bool] = []
+        for package in packages:
+            package_pattern = re.compile(
+                f"{package}([ \t]+)(install|hold)"  # noqa: E201
+            )
+            exists.append(len(list(filter(package_pattern.match, selections))) == 1)
+        return exists
 
     def _is_package_in_repo(self, package: str) -> bool:
         command = f"apt-cache policy {package}"
@@ -42,6 +42,7 @@ from azure.mgmt.compute.models import (
     GalleryImage,
     VirtualMachine,
 )
+from azure.mgmt.core.polling.arm_polling import ARMPolling
 from azure.mgmt.keyvault import KeyVaultManagementClient
 from azure.mgmt.keyvault.models import (
     AccessPolicyEntry,
@@ -1816,6 +1817,34 @@ def wait_operation(
     return result
 
 
+class BoundedArmPolling(ARMPolling):  # type: ignore
+    """
+    ARM polling with intervals doubling from min_interval up to max_interval.
+    Retry-After headers are used only when they are shorter, because ARM often
+    asks for 30-60 seconds even when the operation completes in seconds. Pass it
+    as the polling argument of begin_* methods, with the same lro_options the
+    SDK uses for the operation.
+    """
+
+    def __init__(
+        self, min_interval: float = 1, max_interval: float = 30, **kwargs: Any
+    ) -> None:
+        super().__init__(timeout=min_interval, **kwargs)
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._poll_count = 0
+
+    def _extract_delay(self) -> float:
+        interval: float = min(
+            self._min_interval * 2**self._poll_count, self._max_interval
+        )
+        self._poll_count += 1
+        # the base class returns Retry-After if exists, otherwise the timeout.
+        self._timeout = interval
+        delay: float = super()._extract_delay()
+        return min(delay, interval)
+
+
 def get_storage_credential(
     credential: Any,
     subscription_id: str,
@@ -2082,29 +2111,37 @@ def copy_vhd_to_storage(
     # lock here to prevent a vhd is copied in multi-thread
     cached_key: Optional[bytearray] = None
     with _global_sas_vhd_copy_lock:
-        blobs = container_client.list_blobs(name_starts_with=dst_vhd_name)
+        # Blobs are listed by name, so the cached vhd comes first if it exists.
+        # Request a single result, instead of a full page of 5000 blobs.
+        blob = next(
+            iter(
+                container_client.list_blobs(
+                    name_starts_with=dst_vhd_name, results_per_page=1
+                )
+            ),
+            None,
+        )
         blob_client = container_client.get_blob_client(dst_vhd_name)
         vhd_exists = False
-        for blob in blobs:
-            if blob:
-                # check if hash key matched with original key.
-                if blob.content_settings:
-                    cached_key = blob.content_settings.get("content_md5", None)
-                if is_stuck_copying(blob_client, log):
-                    # Delete the stuck vhd.
-                    blob_client.delete_blob(delete_snapshots="include")
-                elif original_key and cached_key:
-                    if original_key == cached_key:
-                        log.debug("the sas url is copied already, use it directly.")
-                        vhd_exists = True
-                    else:
-                        log.debug("found cached vhd, but the hash key mismatched.")
-                else:
-                    log.debug(
-                        "No md5 content either in original blob or current blob. "
-                        "Then no need to check the hash key"
-                    )
+        if blob:
+            # check if hash key matched with original key.
+            if blob.content_settings:
+                cached_key = blob.content_settings.get("content_md5", None)
+            if is_stuck_copying(blob_client, log):
+                # Delete the stuck vhd.
+                blob_client.delete_blob(delete_snapshots="include")
+            elif original_key and cached_key:
+                if original_key == cached_key:
+                    log.debug("the sas url is copied already, use it directly.")
                     vhd_exists = True
+                else:
+                    log.debug("found cached vhd, but the hash key mismatched.")
+            else:
+                log.debug(
+                    "No md5 content either in original blob or current blob. "
+                    "Then no need to check the hash key"
+                )
+                vhd_exists = True
 
         if not vhd_exists:
             azcopy_path = platform._azure_runbook.azcopy_path
@@ -2995,6 +3032,10 @@ def check_or_create_gallery_image_version(
                 gallery_image_name,
                 gallery_image_version,
                 image_version_post_body,
+                # the target regions are replicated in parallel by this single
+                # operation. Poll with bounded intervals, so the completion is
+                # noticed soon instead of up to 30 seconds later.
+                polling=BoundedArmPolling(),
             )
             wait_operation(operation)
         else:
@@ -3009,15 +3050,17 @@ def check_blob_exist(
     blob_name: str,
     raise_error: bool = True,
 ) -> None:
-    container_client = get_or_create_storage_container(
+    # The blob HEAD request returns not found if the container doesn't exist
+    # either, so there is no need to check the container first.
+    blob_service_client = get_blob_service_client(
         credential=platform.credential,
         cloud=platform.cloud,
         account_name=account_name,
-        container_name=container_name,
-        allow_create=False,
         platform=platform,
     )
-    blob_client = container_client.get_blob_client(blob_name)
+    blob_client = blob_service_client.get_blob_client(
+        container=container_name, blob=blob_name
+    )
     blob_exist = blob_client.exists()
     if raise_error and not blob_exist:
         raise LisaException(f"Blob {blob_name} does not exist.")
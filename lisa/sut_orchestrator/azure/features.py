@@ -14,6 +14,7 @@ from random import randint
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
     List,
     Optional,
@@ -100,6 +101,7 @@ from lisa.util import (
 if TYPE_CHECKING:
     from .platform_ import AzurePlatform
 
+from lisa.util.parallel import run_in_parallel
 from lisa.util.perf_timer import create_timer
 
 from .. import AZURE
@@ -4289,8 +4291,11 @@ class AzureFileShare(AzureFeatureMixin, Feature):
         # Reuse existing file shares if they exist, otherwise create new ones
         # Determine protocol string from passed protocol enum
         protocols_str = "NFS" if protocol == FileShareProtocol.NFS else "SMB"
-        for share_name in file_share_names:
-            fs_url_dict[share_name] = get_or_create_file_share(
+        # The shares are independent of each other, so create them in parallel
+        # instead of paying the storage API round trips once per share.
+        create_share_tasks: List[Callable[[], str]] = [
+            partial(
+                get_or_create_file_share,
                 credential=platform.credential,
                 subscription_id=platform.subscription_id,
                 cloud=platform.cloud,
@@ -4303,8 +4308,14 @@ class AzureFileShare(AzureFeatureMixin, Feature):
                 provisioned_iops=provisioned_iops,
                 provisioned_bandwidth_mibps=provisioned_bandwidth_mibps,
             )
-            # Track protocol per share for proper cleanup
-            self._file_share_protocols[share_name] = protocol
+            for share_name in file_share_names
+        ]
+        if create_share_tasks:
+            share_urls = run_in_parallel(create_share_tasks, log=self._log)
+            for share_name, share_url in zip(file_share_names, share_urls):
+                fs_url_dict[share_name] = share_url
+                # Track protocol per share for proper cleanup
+                self._file_share_protocols[share_name] = protocol
 
         # Create file private endpoint, always after all shares have been created
         # There is a known issue in API preventing access to data plane
@@ -4560,53 +4571,55 @@ class AzureFileShare(AzureFeatureMixin, Feature):
         # (deploy:false or keep_environment:always)
         # where previous tests may have left entries that weren't cleaned up.
         # Using # as sed delimiter since paths contain /
-        for folder_name in test_folders_share_dict.keys():
-            node.execute(
-                f"sed -i '\\#{folder_name}#d' /etc/fstab",
-                sudo=True,
-                shell=True,
+        fstab_commands: List[str] = []
+        if test_folders_share_dict:
+            sed_expressions = " ".join(
+                f"-e '\\#{folder_name}#d'" for folder_name in test_folders_share_dict
             )
+            fstab_commands.append(f"sed -i {sed_expressions} /etc/fstab")
         # Also clean up any stale backup files from previous tests
-        node.execute("rm -f /etc/fstab.backup /etc/fstab_cifs", sudo=True)
+        fstab_commands.append("rm -f /etc/fstab_cifs")
+        # Create backup of original fstab before adding file share entries
+        # This backup is a safety net for VM reuse scenarios only. It's taken
+        # after the stale entries are removed, so replacing the backup of a
+        # previous run is intended.
+        fstab_commands.append("cp -f /etc/fstab /etc/fstab.backup")
+        node.execute("; ".join(fstab_commands), sudo=True, shell=True)
+
+        echo = node.tools[Echo]
 
         # Only SHARED_KEY auth mode needs credential file setup
         # Managed identity, Kerberos, and NFS (NETWORK) don't need credential files
         if self._auth_mode == FileShareAuthMode.SHARED_KEY and account_credential:
-            # Create smbcredentials folder if it doesn't exist
+            # Create smbcredentials folder if it doesn't exist, mkdir -p is a
+            # no-op otherwise, so no separate existence check is needed.
             # Do NOT delete existing folder - may have credentials for other mounts
-            folder_path = node.get_pure_path("/etc/smbcredentials")
-            if not node.shell.exists(folder_path):
-                node.shell.mkdir(folder_path)
+            node.execute(f"mkdir -p {self.CREDENTIAL_DIR}", sudo=True)
 
             # Create credential file with storage account name
             # This avoids conflicts with other file share mounts on reused VMs
             file_path = node.get_pure_path(self._credential_file)
-            # Remove existing credential file if it exists (from previous run)
-            node.execute(f"rm -f {file_path}", sudo=True)
-            echo = node.tools[Echo]
             username = account_credential.get("account_name", "")
             password = account_credential.get("account_key", "")
             if password:
                 add_secret(password)
+            # Write both lines in one call. It overwrites the credential file
+            # left by a previous run, so there is no need to remove it first.
             echo.write_to_file(
-                f"username={username}", file_path, sudo=True, append=True
+                f"username={username}\npassword={password}", file_path, sudo=True
             )
-            echo.write_to_file(
-                f"password={password}", file_path, sudo=True, append=True
-            )
-
-        echo = node.tools[Echo]
-        # Create backup of original fstab before adding file share entries
-        # This backup is a safety net for VM reuse scenarios only
-        node.execute("cp -f /etc/fstab /etc/fstab.backup", sudo=True)
 
         # Determine filesystem type based on protocol
         is_nfs = protocol == FileShareProtocol.NFS
         fs_type = "nfs" if is_nfs else "cifs"
 
-        for folder_name, share in test_folders_share_dict.items():
-            node.execute(f"mkdir -p {folder_name}", sudo=True)
+        if not test_folders_share_dict:
+            return
 
+        # Create all mount points and add all fstab entries with one command each
+        node.execute(f"mkdir -p {' '.join(test_folders_share_dict)}", sudo=True)
+        fstab_entries: List[str] = []
+        for folder_name, share in test_folders_share_dict.items():
             if is_nfs:
                 # For NFS, convert share URL from //server/share to
                 # server:/account/share format
@@ -4621,12 +4634,13 @@ class AzureFileShare(AzureFeatureMixin, Feature):
                 # SMB uses //server/share format directly
                 mount_source = share
 
-            echo.write_to_file(
-                f"{mount_source} {folder_name} {fs_type} {fstab_info}",
-                node.get_pure_path("/etc/fstab"),
-                sudo=True,
-                append=True,
-            )
+            fstab_entries.append(f"{mount_source} {folder_name} {fs_type} {fstab_info}")
+        echo.write_to_file(
+            "\n".join(fstab_entries),
+            node.get_pure_path("/etc/fstab"),
+            sudo=True,
+            append=True,
+        )
 
 
 class Virtualization(AzureFeatureMixin, features.Virtualization):
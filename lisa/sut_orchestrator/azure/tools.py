@@ -84,12 +84,17 @@ class Waagent(Tool):
             result = self.run("-version")
         return get_matched_str(result.stdout, self.__version_pattern)
 
-    def deprovision(self) -> None:
+    def deprovision(self, update_envs: Optional[Dict[str, str]] = None) -> None:
         # the deprovision doesn't delete user, because the VM may be needed. If
         # the vm need to be exported clearly, it needs to remove the current
         # user with below command:
         # self.run("-deprovision+user --force", sudo=True)
-        self.run("-deprovision --force", sudo=True, expected_exit_code=0)
+        self.run(
+            "-deprovision --force",
+            sudo=True,
+            update_envs=update_envs,
+            expected_exit_code=0,
+        )
 
     def upgrade_from_source(self, source_version: str = "") -> None:
         git = self.node.tools[Git]
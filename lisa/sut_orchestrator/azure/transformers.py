@@ -1,21 +1,30 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import json
 from dataclasses import dataclass, field
-from pathlib import PurePosixPath
-from typing import Any, Dict, List, Optional, Type, Union, cast
-
+from functools import partial
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, cast
+from uuid import uuid4
+
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    HttpResponseError,
+    ResourceExistsError,
+    ResourceNotFoundError,
+)
 from azure.mgmt.compute.models import GrantAccessData
 from dataclasses_json import dataclass_json
 from marshmallow import validate
 from retry import retry
 
 from lisa import schema
-from lisa.environment import Environments, EnvironmentSpace
+from lisa.environment import Environment, Environments, EnvironmentSpace
 from lisa.features import StartStop
 from lisa.node import Node, RemoteNode
 from lisa.parameter_parser.runbook import RunbookBuilder
-from lisa.platform_ import load_platform_from_builder
+from lisa.platform_ import load_platform
 from lisa.transformer import Transformer
 from lisa.util import (
     LisaException,
@@ -24,10 +33,12 @@ from lisa.util import (
     get_date_str,
     get_datetime_path,
 )
+from lisa.util.parallel import run_in_parallel
 
 from .common import (
     AZURE_SHARED_RG_NAME,
     AzureNodeSchema,
+    BoundedArmPolling,
     check_blob_exist,
     check_or_create_gallery,
     check_or_create_gallery_image,
@@ -54,17 +65,53 @@ from .tools import Waagent
 DEFAULT_EXPORTED_VHD_CONTAINER_NAME = "lisa-vhd-exported"
 DEFAULT_VHD_SUFFIX = "exported"
 
+# Initialized platforms keyed by the resolved platform runbook. Transformers
+# sharing the same platform runbook reuse the credential, subscription and
+# shared resource group checks done in initialize.
+_platform_cache: Dict[str, AzurePlatform] = {}
+_platform_cache_lock = Lock()
+
 
-@retry(tries=10, jitter=(1, 2))  # type: ignore
-def _generate_vhd_path(container_client: Any, file_name_part: str = "") -> str:
-    path = PurePosixPath(
-        f"{get_date_str()}/{get_datetime_path()}_"
+def _generate_vhd_path(file_name_part: str = "") -> str:
+    # The random part keeps paths unique across exports started in the same
+    # second, so the container doesn't need to be listed before copying.
+    return (
+        f"{get_date_str()}/{get_datetime_path()}_{uuid4().hex[:8]}_"
         f"{DEFAULT_VHD_SUFFIX}_{file_name_part}.vhd"
     )
-    blobs = container_client.list_blobs(name_starts_with=path)
-    for _ in blobs:
-        raise LisaException(f"blob exists already: {path}")
-    return str(path)
+
+
+# Error codes of the conditional copy when the destination exists. The service
+# returns 412 for an unmet If-None-Match, which the SDK doesn't map to
+# ResourceExistsError.
+_BLOB_EXISTS_ERROR_CODES = ("TargetConditionNotMet", "ConditionNotMet")
+
+
+# The copy is conditional on the destination not existing, so a conflict is
+# detected by the copy itself. On conflict, a new path is generated. The
+# exponential backoff with jitter spreads out parallel transformers.
+@retry(  # type: ignore
+    ResourceExistsError, tries=10, delay=1, backoff=2, max_delay=30, jitter=(0, 1)
+)
+def _start_copy_to_new_blob(
+    container_client: Any, source_url: str, file_name_part: str = ""
+) -> Any:
+    blob_client = container_client.get_blob_client(_generate_vhd_path(file_name_part))
+    try:
+        blob_client.start_copy_from_url(
+            source_url,
+            metadata=None,
+            incremental_copy=False,
+            match_condition=MatchConditions.IfMissing,
+        )
+    except HttpResponseError as e:
+        if e.error_code in _BLOB_EXISTS_ERROR_CODES:
+            raise ResourceExistsError(
+                message=f"blob '{blob_client.blob_name}' already exists.",
+                response=e.response,
+            ) from e
+        raise
+    return blob_client
 
 
 @dataclass_json
@@ -115,10 +162,22 @@ class DeployTransformerSchema(schema.Transformer):
 @dataclass_json
 @dataclass
 class DeleteTransformerSchema(schema.Transformer):
-    resource_group_name: str = field(default="", metadata=field_metadata(required=True))
+    resource_group_name: str = ""
+    # more resource groups to delete. All resource groups are deleted in
+    # parallel.
+    resource_group_names: List[str] = field(default_factory=list)
     keep_environment: Optional[Union[str, bool]] = constants.ENVIRONMENT_KEEP_NO
     wait_delete: bool = False
 
+    def __post_init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__post_init__(*args, **kwargs)
+        # empty names are skipped on deletion, so at least one must be non-empty.
+        if not any([self.resource_group_name, *self.resource_group_names]):
+            raise LisaException(
+                "one of 'resource_group_name' or 'resource_group_names' must be "
+                "specified in azure_delete transformer."
+            )
+
 
 class VhdTransformer(Transformer):
     """
@@ -154,13 +213,20 @@ class VhdTransformer(Transformer):
             self._log,
         )
 
-        if runbook.vm_name:
-            node = next(
-                x for x in environment.nodes.list() if x.name == runbook.vm_name
+        # if no vm_name specified, use the first vm
+        node = next(
+            (
+                x
+                for x in environment.nodes.list()
+                if not runbook.vm_name or x.name == runbook.vm_name
+            ),
+            None,
+        )
+        if not node:
+            raise LisaException(
+                f"cannot find vm '{runbook.vm_name}' in resource group "
+                f"'{runbook.resource_group_name}'"
             )
-        else:
-            # if no vm_name specified, use the first vm
-            node = next(x for x in environment.nodes.list())
 
         assert isinstance(node, RemoteNode)
 
@@ -168,9 +234,12 @@ class VhdTransformer(Transformer):
 
         virtual_machine = get_vm(platform, node)
 
-        outputs = self._export_vhd(platform, virtual_machine)
+        # exporting and restoring use the same client.
+        compute_client = get_compute_client(platform)
+
+        outputs = self._export_vhd(platform, compute_client, virtual_machine)
 
-        self._restore_vm(platform, virtual_machine, node)
+        self._restore_vm(compute_client, virtual_machine, node)
 
         return outputs
 
@@ -182,99 +251,71 @@ class VhdTransformer(Transformer):
         if runbook.deprovision:
             # prepare vm for exporting
             wa = node.tools[Waagent]
-            node.execute("export HISTSIZE=0", shell=True)
-            wa.deprovision()
+            # an exported HISTSIZE doesn't survive its own SSH session, so set
+            # it on the deprovision command, which runs last on the VM.
+            wa.deprovision(update_envs={"HISTSIZE": "0"})
 
         # stop the vm
         startstop = node.features[StartStop]
         startstop.stop()
 
     def _export_vhd(
-        self, platform: AzurePlatform, virtual_machine: Any
+        self, platform: AzurePlatform, compute_client: Any, virtual_machine: Any
     ) -> Dict[str, str]:
         runbook: VhdTransformerSchema = self.runbook
-        compute_client = get_compute_client(platform)
-
-        # generate sas url from os disk, so it can be copied.
-        self._log.debug("generating sas url...")
         location = virtual_machine.location
-        os_disk_name = virtual_machine.storage_profile.os_disk.name
-
-        has_vmgs = (
-            virtual_machine.storage_profile.os_disk.managed_disk.security_profile
-            is not None
-        )
-
-        operation = compute_client.disks.begin_grant_access(
-            resource_group_name=runbook.resource_group_name,
-            disk_name=os_disk_name,
-            grant_access_data=GrantAccessData(
-                access="Read",
-                duration_in_seconds=86400,
-                get_secure_vm_guest_state_sas=has_vmgs,
-            ),
-        )
-        wait_operation(operation)
-        result = operation.result()
-        sas_url = result.access_sas
-        vmgs_sas_url = result.security_data_access_sas or ""
-        assert sas_url, "cannot get sas_url from os disk"
-        assert isinstance(sas_url, str), "sas_url is not a string"
-        assert isinstance(vmgs_sas_url, str), "vmgs_sas_url is not a string"
-
-        self._log.debug("getting or creating storage account and container...")
-        # get vhd container
         if not runbook.storage_account_name:
             runbook.storage_account_name = get_storage_account_name(
                 subscription_id=platform.subscription_id, location=location, type_="t"
             )
 
-        check_or_create_storage_account(
-            credential=platform.credential,
-            subscription_id=platform.subscription_id,
-            cloud=platform.cloud,
-            account_name=runbook.storage_account_name,
-            resource_group_name=runbook.shared_resource_group_name,
-            location=location,
+        # granting access and preparing the container don't depend on each
+        # other, and both wait on Azure operations. So run them in parallel.
+        (sas_url, vmgs_sas_url), container_client = run_in_parallel(
+            [
+                partial(self._grant_disk_access, compute_client, virtual_machine),
+                partial(self._get_or_create_container, platform, location),
+            ],
             log=self._log,
         )
-        container_client = get_or_create_storage_container(
-            credential=platform.credential,
-            cloud=platform.cloud,
-            account_name=runbook.storage_account_name,
-            container_name=runbook.container_name,
-            platform=platform,
-        )
 
-        if runbook.custom_blob_name:
-            vhd_path = runbook.custom_blob_name
-        else:
-            vhd_path = _generate_vhd_path(container_client, runbook.file_name_part)
-        vhd_url_path = f"{container_client.url}/{vhd_path}"
-        vhd_blob_client = container_client.get_blob_client(vhd_path)
-        if runbook.azcopy_path:
-            sas_token = generate_user_delegation_sas_token(
-                container_name=vhd_blob_client.container_name,
-                blob_name=vhd_blob_client.blob_name,
-                credential=platform.credential,
-                cloud=platform.cloud,
-                account_name=runbook.storage_account_name,
-                writable=True,
-                platform=platform,
-            )
-            dst_vhd_sas_url = f"{vhd_url_path}?{sas_token}"
-            self._log.info(f"Copying VHD using AzCopy: {vhd_path}")
-            copy_vhd_using_azcopy(
-                azcopy_path=runbook.azcopy_path,
-                src_vhd_sas_url=sas_url,
-                dst_vhd_sas_url=dst_vhd_sas_url,
-                blob_client=vhd_blob_client,
-                log=self._log,
-            )
+        if runbook.custom_blob_name or runbook.azcopy_path:
+            if runbook.custom_blob_name:
+                vhd_path = runbook.custom_blob_name
+            else:
+                vhd_path = _generate_vhd_path(runbook.file_name_part)
+            vhd_blob_client = container_client.get_blob_client(vhd_path)
+            if runbook.azcopy_path:
+                sas_token = generate_user_delegation_sas_token(
+                    container_name=vhd_blob_client.container_name,
+                    blob_name=vhd_blob_client.blob_name,
+                    credential=platform.credential,
+                    cloud=platform.cloud,
+                    account_name=runbook.storage_account_name,
+                    writable=True,
+                    platform=platform,
+                )
+                dst_vhd_sas_url = f"{container_client.url}/{vhd_path}?{sas_token}"
+                self._log.info(f"Copying VHD using AzCopy: {vhd_path}")
+                copy_vhd_using_azcopy(
+                    azcopy_path=runbook.azcopy_path,
+                    src_vhd_sas_url=sas_url,
+                    dst_vhd_sas_url=dst_vhd_sas_url,
+                    blob_client=vhd_blob_client,
+                    log=self._log,
+                )
+            else:
+                vhd_blob_client.start_copy_from_url(
+                    sas_url, metadata=None, incremental_copy=False
+                )
         else:
-            vhd_blob_client.start_copy_from_url(
-                sas_url, metadata=None, incremental_copy=False
+            # the path is generated by the copy, so it can pick a new one on
+            # conflict.
+            vhd_blob_client = _start_copy_to_new_blob(
+                container_client, sas_url, runbook.file_name_part
             )
+            vhd_path = vhd_blob_client.blob_name
+        vhd_url_path = f"{container_client.url}/{vhd_path}"
 
         if vmgs_sas_url:
             vmgs_path = vhd_path.replace(".vhd", "_vmgs.vhd")
@@ -317,18 +358,77 @@ class VhdTransformer(Transformer):
 
         return {self.__url_name: vhd_url_path, self.__vmgs_url_name: vmgs_url_path}
 
+    def _grant_disk_access(
+        self, compute_client: Any, virtual_machine: Any
+    ) -> Tuple[str, str]:
+        runbook: VhdTransformerSchema = self.runbook
+
+        # generate sas url from os disk, so it can be copied.
+        self._log.debug("generating sas url...")
+        os_disk_name = virtual_machine.storage_profile.os_disk.name
+
+        has_vmgs = (
+            virtual_machine.storage_profile.os_disk.managed_disk.security_profile
+            is not None
+        )
+
+        operation = compute_client.disks.begin_grant_access(
+            resource_group_name=runbook.resource_group_name,
+            disk_name=os_disk_name,
+            grant_access_data=GrantAccessData(
+                access="Read",
+                duration_in_seconds=86400,
+                get_secure_vm_guest_state_sas=has_vmgs,
+            ),
+            polling=BoundedArmPolling(
+                max_interval=5, lro_options={"final-state-via": "location"}
+            ),
+        )
+        wait_operation(operation)
+        result = operation.result()
+        sas_url = result.access_sas
+        vmgs_sas_url = result.security_data_access_sas or ""
+        assert sas_url, "cannot get sas_url from os disk"
+        assert isinstance(sas_url, str), "sas_url is not a string"
+        assert isinstance(vmgs_sas_url, str), "vmgs_sas_url is not a string"
+
+        return sas_url, vmgs_sas_url
+
+    def _get_or_create_container(self, platform: AzurePlatform, location: str) -> Any:
+        runbook: VhdTransformerSchema = self.runbook
+
+        self._log.debug("getting or creating storage account and container...")
+        check_or_create_storage_account(
+            credential=platform.credential,
+            subscription_id=platform.subscription_id,
+            cloud=platform.cloud,
+            account_name=runbook.storage_account_name,
+            resource_group_name=runbook.shared_resource_group_name,
+            location=location,
+            log=self._log,
+        )
+        return get_or_create_storage_container(
+            credential=platform.credential,
+            cloud=platform.cloud,
+            account_name=runbook.storage_account_name,
+            container_name=runbook.container_name,
+            platform=platform,
+        )
+
     def _restore_vm(
-        self, platform: AzurePlatform, virtual_machine: Any, node: Node
+        self, compute_client: Any, virtual_machine: Any, node: Node
     ) -> None:
         runbook: VhdTransformerSchema = self.runbook
 
         self._log.debug("restoring vm...")
         # release the vhd export lock, so it can be started back
-        compute_client = get_compute_client(platform)
         os_disk_name = virtual_machine.storage_profile.os_disk.name
         operation = compute_client.disks.begin_revoke_access(
             resource_group_name=runbook.resource_group_name,
             disk_name=os_disk_name,
+            polling=BoundedArmPolling(
+                max_interval=5, lro_options={"final-state-via": "location"}
+            ),
         )
         wait_operation(operation)
 
@@ -378,7 +478,10 @@ class DeployTransformer(Transformer):
         ]
 
     def _internal_run(self) -> Dict[str, Any]:
-        platform = _load_platform(self._runbook_builder, self.type_name())
+        # the platform runbook is modified below, so don't share the instance.
+        platform = _load_platform(
+            self._runbook_builder, self.type_name(), use_cache=False
+        )
         runbook: DeployTransformerSchema = self.runbook
 
         envs = Environments()
@@ -428,35 +531,74 @@ class DeleteTransformer(Transformer):
         return []
 
     def _internal_run(self) -> Dict[str, Any]:
-        platform = _load_platform(self._runbook_builder, self.type_name())
+        # the platform runbook is modified below, so don't share the instance.
+        platform = _load_platform(
+            self._runbook_builder, self.type_name(), use_cache=False
+        )
         runbook: DeleteTransformerSchema = self.runbook
 
-        # mock up environment for deletion
+        resource_group_names = [runbook.resource_group_name]
+        resource_group_names.extend(runbook.resource_group_names)
+        # remove empty and duplicate names, and keep the order.
+        resource_group_names = list(dict.fromkeys(x for x in resource_group_names if x))
+
+        # mock up environments for deletion
         envs = Environments()
-        environment_requirement = EnvironmentSpace()
-        environment_requirement.nodes.append(schema.NodeSpace())
-        environment = envs.from_requirement(environment_requirement)
-        assert environment
-        environment_context = get_environment_context(environment)
-        environment_context.resource_group_name = runbook.resource_group_name
-        environment_context.resource_group_is_specified = True
+        environments: List[Environment] = []
+        for resource_group_name in resource_group_names:
+            environment_requirement = EnvironmentSpace()
+            environment_requirement.nodes.append(schema.NodeSpace())
+            environment = envs.from_requirement(environment_requirement)
+            assert environment
+            environment_context = get_environment_context(environment)
+            environment_context.resource_group_name = resource_group_name
+            environment_context.resource_group_is_specified = True
+            environments.append(environment)
 
         platform.runbook.keep_environment = runbook.keep_environment
         platform._azure_runbook.wait_delete = runbook.wait_delete
-        platform.delete_environment(environment)
+        # each deletion may wait minutes on its own operation, so run them in
+        # parallel.
+        run_in_parallel(
+            [partial(platform.delete_environment, x) for x in environments],
+            log=self._log,
+        )
 
         return {}
 
 
+def _parse_gallery_image_fullname(
+    gallery_image_fullname: str,
+) -> Tuple[str, str, str, str]:
+    parts = gallery_image_fullname.split()
+    if len(parts) != 4:
+        raise LisaException(
+            "gallery_image_fullname should be in format: "
+            f"'publisher offer sku version', got: '{gallery_image_fullname}'"
+        )
+    return parts[0], parts[1], parts[2], parts[3]
+
+
 def _load_platform(
-    runbook_builder: RunbookBuilder, transformer_name: str
+    runbook_builder: RunbookBuilder, transformer_name: str, use_cache: bool = True
 ) -> AzurePlatform:
-    platform = load_platform_from_builder(runbook_builder)
-    assert isinstance(
-        platform, AzurePlatform
-    ), f"'{transformer_name}' support only Azure platform"
+    platform_runbook_data = runbook_builder.partial_resolve(constants.PLATFORM)
+    cache_key = json.dumps(platform_runbook_data, sort_keys=True, default=str)
+    with _platform_cache_lock:
+        cached_platform = _platform_cache.get(cache_key, None) if use_cache else None
+        if cached_platform:
+            return cached_platform
+
+        platform = load_platform(
+            schema.load_by_type_many(schema.Platform, platform_runbook_data)
+        )
+        assert isinstance(
+            platform, AzurePlatform
+        ), f"'{transformer_name}' support only Azure platform"
 
-    platform.initialize()
+        platform.initialize()
+        if use_cache:
+            _platform_cache[cache_key] = platform
     return platform
 
 
@@ -604,7 +746,25 @@ class SharedGalleryImageTransformer(Transformer):
 
     def _internal_run(self) -> Dict[str, Any]:
         runbook: SigTransformerSchema = self.runbook
+        # parse it before any Azure operation, so a malformed name fails fast.
+        (
+            gallery_image_publisher,
+            gallery_image_offer,
+            gallery_image_sku,
+            gallery_image_version,
+        ) = _parse_gallery_image_fullname(runbook.gallery_image_fullname)
         platform = _load_platform(self._runbook_builder, self.type_name())
+        sig_url = (
+            f"{runbook.gallery_name}/"
+            f"{runbook.gallery_image_name}/"
+            f"{gallery_image_version}"
+        )
+        if self._image_version_exists(platform, gallery_image_version):
+            # the gallery and image definition exist with the version, so
+            # there is nothing to copy or create.
+            self._log.info(f"SIG image version exists already: {sig_url}")
+            return {self.__sig_name: sig_url}
+
         image_location = runbook.gallery_image_location[0]
         if not runbook.gallery_resource_group_location:
             runbook.gallery_resource_group_location = image_location
@@ -641,12 +801,6 @@ class SharedGalleryImageTransformer(Transformer):
             if disk_controller_types:
                 features["DiskControllerTypes"] = disk_controller_types
 
-        (
-            gallery_image_publisher,
-            gallery_image_offer,
-            gallery_image_sku,
-            gallery_image_version,
-        ) = tuple(runbook.gallery_image_fullname.split())
         # create resource group if specified resource group doesn't exist
         check_or_create_resource_group(
             platform.credential,
@@ -696,15 +850,24 @@ class SharedGalleryImageTransformer(Transformer):
             runbook.gallery_image_location,
         )
 
-        sig_url = (
-            f"{runbook.gallery_name}/"
-            f"{runbook.gallery_image_name}/"
-            f"{gallery_image_version}"
-        )
-
         self._log.info(f"SIG Url: {sig_url}")
         return {self.__sig_name: sig_url}
 
+    def _image_version_exists(
+        self, platform: AzurePlatform, gallery_image_version: str
+    ) -> bool:
+        runbook: SigTransformerSchema = self.runbook
+        try:
+            get_compute_client(platform).gallery_image_versions.get(
+                runbook.gallery_resource_group_name,
+                runbook.gallery_name,
+                runbook.gallery_image_name,
+                gallery_image_version,
+            )
+        except ResourceNotFoundError:
+            return False
+        return True
+
     def _get_image_features(
         self, platform: AzurePlatform, marketplace: str
     ) -> Dict[str, Any]:
@@ -785,7 +948,7 @@ class DeleteSharedGalleryImageTransformer(Transformer):
 
         try:
             platform = _load_platform(self._runbook_builder, self.type_name())
-            gallery_image_version = self._parse_version_from_fullname(
+            _, _, _, gallery_image_version = _parse_gallery_image_fullname(
                 runbook.gallery_image_fullname
             )
 
@@ -814,15 +977,6 @@ class DeleteSharedGalleryImageTransformer(Transformer):
 
         return {}
 
-    def _parse_version_from_fullname(self, gallery_image_fullname: str) -> str:
-        parts = gallery_image_fullname.split()
-        if len(parts) != 4:
-            raise LisaException(
-                "gallery_image_fullname should be in format: "
-                f"'publisher offer sku version', got: '{gallery_image_fullname}'"
-            )
-        return parts[3]
-
     def _delete_sig_image_version(
         self,
         platform: AzurePlatform,
@@ -58,6 +58,8 @@ class Git(Tool):
         fail_on_exists: bool = True,
         auth_token: Optional[str] = None,
         timeout: int = 600,
+        depth: int = 0,
+        filter_: str = "",
     ) -> pathlib.PurePath:
         self.node.shell.mkdir(cwd, exist_ok=True)
         auth_flag = ""
@@ -65,6 +67,14 @@ class Git(Tool):
             auth_flag = f'-c http.extraheader="AUTHORIZATION: bearer {auth_token}"'
 
         cmd = f"clone {auth_flag} {url} {dir_name} --recurse-submodules"
+        if depth:
+            # a shallow clone only has the history of the ref, so the ref
+            # must be a branch or a tag. Commit ids cannot be cloned this way.
+            cmd += f" --depth {depth} --shallow-submodules"
+            if ref:
+                cmd += f" --branch {ref}"
+        if filter_:
+            cmd += f" --filter={filter_}"
 
         # git print to stderr for normal info, so set no_error_log to True.
         result = self.run(cmd, cwd=cwd, no_error_log=True, timeout=timeout)
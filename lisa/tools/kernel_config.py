@@ -2,7 +2,7 @@
 # Licensed under the MIT license.
 import re
 from enum import Enum
-from typing import Any, Optional, Type
+from typing import Any, Dict, Optional, Type
 
 from assertpy.assertpy import assert_that
 
@@ -39,30 +39,13 @@ class KernelConfig(Tool):
     def is_kernel_config_set_to(
         self, config_name: str, config_value: ModulesType
     ) -> bool:
-        return (
-            self.node.execute(
-                f"grep ^{config_name}={config_value.value} {self.config_path}",
-                sudo=True,
-                shell=True,
-            ).exit_code
-            == 0
-        )
+        return self._get_configs().get(config_name) == config_value.value
 
     def is_built_in(self, config_name: str) -> bool:
-        return (
-            self.node.execute(
-                f"grep ^{config_name}=y {self.config_path}", sudo=True, shell=True
-            ).exit_code
-            == 0
-        )
+        return self.is_kernel_config_set_to(config_name, ModulesType.BUILT_IN)
 
     def is_built_as_module(self, config_name: str) -> bool:
-        return (
-            self.node.execute(
-                f"grep ^{config_name}=m {self.config_path}", sudo=True, shell=True
-            ).exit_code
-            == 0
-        )
+        return self.is_kernel_config_set_to(config_name, ModulesType.MODULE)
 
     def is_enabled(self, config_name: str) -> bool:
         return self.is_built_as_module(config_name) or self.is_built_in(config_name)
@@ -74,6 +57,7 @@ class KernelConfig(Tool):
 
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         self.config_path: str = ""
+        self._configs: Optional[Dict[str, str]] = None
         uname_tool = self.node.tools[Uname]
         kernel_ver = uname_tool.get_linux_information().kernel_version_raw
         if isinstance(self.node.os, CoreOs):
@@ -81,6 +65,22 @@ class KernelConfig(Tool):
         else:
             self.config_path = f"/boot/config-{kernel_ver}"
 
+    def _get_configs(self) -> Dict[str, str]:
+        # the config file of a kernel doesn't change, so read and parse it once,
+        # instead of running grep on the node for every query.
+        if self._configs is None:
+            configs: Dict[str, str] = {}
+            result = self.node.execute(
+                f"cat {self.config_path}", sudo=True, shell=True, no_debug_log=True
+            )
+            if result.exit_code == 0:
+                for line in result.stdout.splitlines():
+                    name, separator, value = line.partition("=")
+                    if separator and not name.startswith("#"):
+                        configs[name.strip()] = value.strip()
+            self._configs = configs
+        return self._configs
+
 
 class KernelConfigFreeBSD(KernelConfig):
     _MODULE_CONFIG_MAP = {
@@ -99,6 +99,7 @@ class KernelConfigFreeBSD(KernelConfig):
 
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         self.config_path = "/boot/loader.conf"
+        self._configs = None
 
 
 class KLDStat(Tool):
@@ -58,15 +58,17 @@ class Mkfs(Tool):
         cmd_result.assert_exit_code()
 
     def format_disk(self, disk_name: str, file_system: FileSystem) -> None:
+        self.get_mkfs_tool(file_system).mkfs(disk_name, file_system)
+
+    def get_mkfs_tool(self, file_system: FileSystem) -> "Mkfs":
+        # resolving the tool installs it if needed. Call it before formatting
+        # several disks in parallel, so they don't race on the installation.
         if file_system == FileSystem.xfs:
-            mkfs_xfs = self.node.tools[Mkfsxfs]
-            mkfs_xfs.mkfs(disk_name, file_system)
+            return self.node.tools[Mkfsxfs]
         elif file_system in [FileSystem.ext2, FileSystem.ext3, FileSystem.ext4]:
-            mkfs_ext = self.node.tools[Mkfsext]
-            mkfs_ext.mkfs(disk_name, file_system)
+            return self.node.tools[Mkfsext]
         elif file_system in [FileSystem.btrfs]:
-            mkfs_btrfs = self.node.tools[Mkfsbtrfs]
-            mkfs_btrfs.mkfs(disk_name, file_system)
+            return self.node.tools[Mkfsbtrfs]
         else:
             raise LisaException(f"Unrecognized file system {file_system}.")
 
@@ -1,6 +1,6 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
-from typing import cast
+from typing import List, Tuple, cast
 
 from lisa.executable import Tool
 from lisa.operating_system import Posix
@@ -38,6 +38,26 @@ class Parted(Tool):
         )
         cmd_result.assert_exit_code()
 
+    def make_label_and_partitions(
+        self,
+        disk_name: str,
+        partitions: List[Tuple[str, str, str]],
+        disk_type: str = "gpt",
+    ) -> None:
+        # partitions are (part_type, start, end) tuples. parted accepts several
+        # commands in script mode, so label and all partitions are created in a
+        # single call.
+        mkparts = " ".join(
+            f"mkpart {part_type} {start} {end}" for part_type, start, end in partitions
+        )
+        cmd_result = self.run(
+            f"-s -- {disk_name} mklabel {disk_type} {mkparts}",
+            shell=True,
+            sudo=True,
+            force_run=True,
+        )
+        cmd_result.assert_exit_code()
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
         posix_os.install_packages("parted")
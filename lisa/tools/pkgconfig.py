@@ -1,6 +1,9 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import re
+from typing import Any, Dict, List, Optional
+
 from assertpy import assert_that
 from semver import VersionInfo
 
@@ -10,10 +13,19 @@ from lisa.util import parse_version
 
 
 class Pkgconfig(Tool):
+    # glib-2.0 = 2.72.4
+    _provides_pattern = re.compile(r"^(?P<name>\S+) = (?P<version>\S+)$", re.MULTILINE)
+
     @property
     def command(self) -> str:
         return "pkg-config"
 
+    def _initialize(self, *args: Any, **kwargs: Any) -> None:
+        # versions of all packages known on the node, which is loaded once on the
+        # first query. Packages not in it are queried directly, since they may
+        # be installed after it's loaded.
+        self._known_packages: Optional[Dict[str, str]] = None
+
     @property
     def can_install(self) -> bool:
         return True
@@ -24,6 +36,8 @@ class Pkgconfig(Tool):
         return True
 
     def package_info_exists(self, package_name: str) -> bool:
+        if package_name in self._get_known_packages():
+            return True
         package_info_result = self.run(f"--modversion {package_name}", force_run=True)
         return package_info_result.exit_code == 0
 
@@ -32,18 +46,76 @@ class Pkgconfig(Tool):
         package_name: str,
         update_cached: bool = False,
     ) -> str:
-        info_exists = self.package_info_exists(package_name=package_name)
-        assert_that(info_exists).described_as(
+        if not update_cached:
+            known_packages = self._get_known_packages()
+            if package_name in known_packages:
+                return known_packages[package_name]
+
+        command = f"--modversion {package_name}"
+        result = self.run(command, force_run=update_cached)
+        if result.exit_code != 0 and not update_cached:
+            # the cached failure may be from the time before the package was
+            # installed, so check it again.
+            result = self.run(command, force_run=True)
+        assert_that(result.exit_code).described_as(
             (
                 f"pkg-config information was not available for {package_name}. "
                 "This indicates an installation or package detection bug. "
                 f"ensure .pc file is available for {package_name} on this OS."
             )
-        ).is_true()
-        return self.run(f"--modversion {package_name}").stdout
+        ).is_zero()
+        if self._known_packages is not None:
+            self._known_packages[package_name] = result.stdout
+        return result.stdout
 
     def get_package_version(
         self, package_name: str, update_cached: bool = False
     ) -> VersionInfo:
         version_info = self.get_package_info(package_name, update_cached=update_cached)
         return parse_version(version_info)
+
+    def get_package_versions(
+        self, package_names: List[str], update_cached: bool = False
+    ) -> Dict[str, VersionInfo]:
+        """
+        Query versions of multiple packages in one call. pkg-config prints one
+        version per line, in the order of the given packages.
+        """
+        if not update_cached:
+            known_packages = self._get_known_packages()
+            if all(x in known_packages for x in package_names):
+                return {x: parse_version(known_packages[x]) for x in package_names}
+
+        result = self.run(
+            f"--modversion {' '.join(package_names)}", force_run=update_cached
+        )
+        versions = [x.strip() for x in result.stdout.splitlines() if x.strip()]
+        if result.exit_code == 0 and len(versions) == len(package_names):
+            if self._known_packages is not None:
+                self._known_packages.update(zip(package_names, versions))
+            return {
+                name: parse_version(version)
+                for name, version in zip(package_names, versions)
+            }
+
+        # some packages are missing, query one by one to find which one fails.
+        return {
+            name: self.get_package_version(name, update_cached=update_cached)
+            for name in package_names
+        }
+
+    def _get_known_packages(self) -> Dict[str, str]:
+        if self._known_packages is None:
+            # list all packages with their versions in one command, so the .pc
+            # files are searched once, instead of once per query.
+            result = self.run(
+                f"--print-provides $({self.command} --list-all | cut -d ' ' -f 1)",
+                shell=True,
+                force_run=True,
+                no_error_log=True,
+            )
+            self._known_packages = {
+                match["name"]: match["version"]
+                for match in self._provides_pattern.finditer(result.stdout)
+            }
+        return self._known_packages
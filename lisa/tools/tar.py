@@ -36,6 +36,8 @@ class Tar(Tool):
         sudo: bool = False,
         raise_error: bool = True,
         skip_existing_files: bool = False,
+        bzip2: bool = False,
+        record_size: str = "",
     ) -> None:
         # create folder when it doesn't exist
         assert_that(strip_components).described_as(
@@ -44,8 +46,14 @@ class Tar(Tool):
         self.node.execute(f"mkdir -p {dest_dir}", shell=True)
         if gzip:
             tar_cmd = f"-zxvf {file} -C {dest_dir}"
+        elif bzip2:
+            tar_cmd = f"-jxvf {file} -C {dest_dir}"
         else:
             tar_cmd = f"-xvf {file} -C {dest_dir}"
+        if record_size:
+            # larger records reduce the number of reads on large archives,
+            # ex: 1M. It's a GNU tar option.
+            tar_cmd += f" --record-size={record_size}"
         if strip_components:
             # optionally strip N top level components from a tar file
             tar_cmd += f" --strip-components={strip_components}"
@@ -120,10 +128,31 @@ class Tar(Tool):
         else:
             return content
 
-    def get_root_folder(self, file: str) -> str:
+    def get_root_folder(self, file: str, first_entry_only: bool = False) -> str:
         # convenience method, get the top level output folder
         # and remove the trailing slash
         # NOTE: Will assert if there are multiple root folders.
+        if first_entry_only:
+            # tar stops once head exits, so large archives are not read fully.
+            # The root folder of the first entry is assumed to be the only one.
+            result = self.run(
+                f"-tf {file} | head -n 1",
+                shell=True,
+                force_run=True,
+                sudo=True,
+                expected_exit_code=0,
+                expected_exit_code_failure_message=(
+                    f"Could not list items in tar file {file}"
+                ),
+            )
+            first_entry = result.stdout.strip()
+            if first_entry.startswith("./"):
+                first_entry = first_entry[2:]
+            root_folder = first_entry.split("/")[0]
+            assert_that(root_folder).described_as(
+                f"ERROR: cannot find root folder of tar file {file}."
+            ).is_not_empty()
+            return root_folder
         folders = self.list(file, recursive=False, folders_only=True)
         assert_that(folders).described_as(
             (
@@ -144,6 +173,8 @@ class WindowsTar(Tar):
         sudo: bool = False,
         raise_error: bool = True,
         skip_existing_files: bool = False,
+        bzip2: bool = False,
+        record_size: str = "",
     ) -> None:
         mkdir = self.node.tools[Mkdir]
         mkdir.create_directory(dest_dir)